@@ -38,11 +38,13 @@ def fit_student_t(returns: pd.Series) -> Tuple[float, float, float]:
     return df, loc, scale
 
 if __name__ == "__main__":
+    from .returns import load_returns
+
     try:
         base_dir = Path(__file__).resolve().parents[1]
 
         returns_csv = base_dir / "data" / "output" / "data.csv"
-        returns = pd.read_csv(returns_csv)["return"]
+        returns = load_returns(returns_csv)
         print(f"Loaded {len(returns)} returns (mean = {returns.mean():.6f}, std = {returns.std():.6f})") #:.2f trims output to #.##
 
         mu, sig = fit_normal(returns)
@@ -4,6 +4,7 @@ Purpose: Compute log returns for Student-t VaR / CVaR modeling
 """
 
 from pathlib import Path
+from typing import Dict
 
 import pandas as pd
 import numpy as np
@@ -16,11 +17,66 @@ def print_return_summary(r: pd.Series):
     print(f"\nStd Dev: {r.std():.6f}")
     print(f"Excess Kurtosis: {r.kurt():.2f}")
 
+def load_returns(path: Path, col: str = "return") -> pd.Series:
+    """
+    Load the log return column written by compute_log_returns.
+
+    Parameters ----------
+    path: Path to returns file (.csv, .parquet or .feather)
+    col: Column containing returns
+
+    Output ----------
+    Series of log returns
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path, columns=[col])[col] # columnar, only reads the one column
+    if suffix == ".feather":
+        return pd.read_feather(path, columns=[col])[col]
+    return pd.read_csv(path, usecols=[col], dtype={col: np.float64}, engine="c")[col] # skip date col + type inference
+
+def load_price_arrays(
+    input_path: Path,
+    price_col: str = "price",
+    date_col: str = "snapped_at",
+    date_format: str = "%Y-%m-%d %H:%M:%S UTC",
+) -> Dict[str, np.ndarray]:
+    """
+    Read raw price data into sorted, de-duplicated NumPy arrays (one contiguous array per field)
+    so numeric code can work on them directly without Series wrapping.
+
+    Parameters ----------
+    input_path: Path to raw CSV file
+    price_col: Column containing price data
+    date_col: Column containing timestamp
+    date_format: strftime format of date_col (CoinGecko export default)
+
+    Output ----------
+    {date_col: datetime64 array (UTC, tz-naive), price_col: float64 array}
+    """
+
+    # Load raw data - only the columns we need, prices typed up front (sometimes prices come in as strings)
+    df = pd.read_csv(input_path, usecols=[date_col, price_col], dtype={price_col: np.float64})
+
+    # Parse datetime w/ a fixed format so pandas skips per-row inference
+    df[date_col] = pd.to_datetime(df[date_col], format=date_format, utc=True)
+
+    # Sort chronologically 
+    df = df.sort_values(date_col)
+    df = df.drop_duplicates(subset=[date_col]) # simple check for dups just to clean data if needed
+
+    return {
+        date_col: df[date_col].dt.tz_localize(None).to_numpy(),
+        price_col: np.ascontiguousarray(df[price_col].to_numpy()),
+    }
+
 def compute_log_returns(
     input_path: Path,
     output_path: Path,
     price_col: str = "price",
     date_col: str = "snapped_at",
+    date_format: str = "%Y-%m-%d %H:%M:%S UTC",
+    fmt: str = "csv",
     verbose: bool = True,
 ):
     """
@@ -29,40 +85,34 @@ def compute_log_returns(
 
     Parameters ----------
     input_path: Path to raw CSV file
-    output_path: Path to output CSV file
+    output_path: Path to output file (written as-is for csv, suffix swapped to .parquet / .feather otherwise)
     price_col: Column containing price data
     date_col: Column containing timestamp
+    date_format: strftime format of date_col (CoinGecko export default)
+    fmt: Output format - "csv", "parquet" (snappy) or "feather"
 
     Output ----------
-    output/data.csv
+    date / return file at output_path (e.g. output/data.csv)
     """
 
-    # Load raw data
-    df = pd.read_csv(input_path)
-
-    # Parse datetime
-    df[date_col] = pd.to_datetime(df[date_col], utc=True)
-
-    # Sort chronologically 
-    df = df.sort_values(date_col)
-    df = df.drop_duplicates(subset=[date_col]) # simple check for dups just to clean data if needed
+    arrays = load_price_arrays(input_path, price_col, date_col, date_format)
+    dates, prices = arrays[date_col], arrays[price_col]
 
-    # Compute log returns
-    prices = df[price_col].astype(float) # sometimes prices come in as strings
-    df["return"] = np.log(prices / prices.shift(1))
+    # Compute log returns on the raw arrays
+    log_returns = np.log(prices[1:] / prices[:-1])
 
-    # Drop first NaN return
-    df = df.dropna(subset=["return"])
+    # Drop NaN returns (first row is already gone via the slice)
+    valid = ~np.isnan(log_returns)
 
-    # Keep date (YYYY-MM-DD)
-    df["date"] = df[date_col].dt.date
+    # Keep date (YYYY-MM-DD) - truncate to day in NumPy, no Python object per row
+    out = pd.DataFrame({
+        "date": dates[1:][valid].astype("datetime64[D]"),
+        "return": log_returns[valid],
+    })
 
     # Summary Stats
     if verbose:
-        print_return_summary(df["return"])
-
-    # Select final columns
-    out = df[["date", "return"]]
+        print_return_summary(out["return"])
 
     # Reverse order: most recent first
     out = out.sort_values("date", ascending=False)
@@ -71,7 +121,14 @@ def compute_log_returns(
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Save
-    out.to_csv(output_path, index=False)
+    if fmt == "parquet":
+        out.to_parquet(output_path.with_suffix(".parquet"), compression="snappy", index=False)
+    elif fmt == "feather":
+        out.reset_index(drop=True).to_feather(output_path.with_suffix(".feather"))
+    elif fmt == "csv":
+        out.to_csv(output_path, index=False, date_format="%Y-%m-%d")
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
 
 if __name__ == "__main__":
     base_dir = Path(__file__).resolve().parents[1]
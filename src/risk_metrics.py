@@ -3,10 +3,92 @@ Author: Jake Vick
 Purpose: VaR / CVaR modeling
 """
 
-from scipy.stats import norm, t
+from functools import lru_cache
+import math
+from typing import Tuple, Union
+from scipy.special import ndtri, gammaln
+from scipy.stats import t
 from pathlib import Path
 
-import pandas as pd
+import numpy as np
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2 * math.pi)
+_HALF_LOG_2PI = 0.5 * math.log(2 * math.pi)
+
+# c_j of the large-x series S(x) ~ sum c_j / x^j, j = 1..10 (DLMF 5.11.8, h = -1/2 minus h = 0)
+_GAMMA_RATIO_SERIES = (3/8, 1/8, 3/64, 1/64, 3/640, 1/384, 33/14336, 1/2048, -3/2048, 1/10240)
+_GAMMA_RATIO_SERIES_MIN_X = 25.0
+
+FloatOrArray = Union[float, np.ndarray]
+
+def _std_norm_pdf(z):
+    """Standard Normal density, inlined to skip scipy.stats arg checking (broadcasts like norm.pdf)."""
+    return _INV_SQRT_2PI * np.exp(-0.5 * z * z)
+
+@lru_cache(maxsize=128)
+def _t_quantile(alpha: float, df: float) -> float:
+    """Standard Student-t quantile, cached - t.ppf is a numerical inversion."""
+    return float(t.ppf(alpha, df))
+
+def _t_ppf(alpha, df):
+    """Student-t quantile - cached for scalars, one vectorized t.ppf call for arrays."""
+    if np.ndim(alpha) == 0 and np.ndim(df) == 0:
+        return _t_quantile(float(alpha), float(df))
+    return t.ppf(alpha, df)
+
+def _log_gamma_ratio(x):
+    """
+    S(x) = gammaln(x - 1/2) - gammaln(x) + log(x) / 2, without the cancellation of the
+    direct difference at large x: exact gammaln below 25, asymptotic series above (truncation error < 1e-17).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    large = x >= _GAMMA_RATIO_SERIES_MIN_X
+    with np.errstate(divide="ignore", invalid="ignore"):
+        direct = gammaln(x - 0.5) - gammaln(x) + 0.5 * np.log(x)
+        series = np.polyval(_GAMMA_RATIO_SERIES[::-1] + (0.0,), 1.0 / np.where(large, x, _GAMMA_RATIO_SERIES_MIN_X))
+    return np.where(large, series, direct)
+
+def _t_tail_k(t_q, df):
+    """
+    Closed-form k(t, df) = pdf(t) * (df + t^2) / (df - 1) for the standard Student-t, as
+    log k = S(df / 2) - log(2 pi) / 2 + (1 - df) / 2 * log1p(t^2 / df), which stays accurate at large df.
+    The tail mean diverges for 0 < df <= 1, so k is inf there (CVaR = -inf); df <= 0 is not a valid t and gives nan.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_k = _log_gamma_ratio(df / 2) - _HALF_LOG_2PI + (0.5 - df / 2) * np.log1p(t_q**2 / df)
+        k = np.exp(log_k)
+    return np.where(df > 1, k, np.where(df > 0, np.inf, np.nan))
+
+@lru_cache(maxsize=1)
+def _cvar_t_kernel():
+    """
+    Build the jitted per-asset Student-t CVaR kernel (same log-k form as _t_tail_k, with the
+    quantile t_q and gamma ratio s = _log_gamma_ratio(df / 2) precomputed in NumPy).
+    numba is optional and imported lazily - returns None when it is not installed.
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    # fastmath w/o "nnan"/"ninf" - the kernel deliberately writes nan / -inf for df <= 1
+    @njit(parallel=True, fastmath={"contract", "arcp", "reassoc", "afn"}, cache=True)
+    def kernel(t_q, s, df, loc, scale, alpha):
+        n = t_q.shape[0]
+        out = np.empty(n)
+        for i in prange(n):
+            v = df[i]
+            if v <= 0.0:
+                out[i] = math.nan
+                continue
+            if v <= 1.0:
+                out[i] = -math.inf
+                continue
+            log_k = s[i] - _HALF_LOG_2PI + (0.5 - v / 2.0) * math.log1p(t_q[i] * t_q[i] / v)
+            out[i] = loc[i] - scale[i] * math.exp(log_k) / alpha
+        return out
+
+    return kernel
 
 def compute_var_normal(mu: float, sigma: float, alpha: float = 0.05) -> float:
     """
@@ -20,7 +102,7 @@ def compute_var_normal(mu: float, sigma: float, alpha: float = 0.05) -> float:
     Output ----------
     VaR estimate
     """
-    return mu + sigma * norm.ppf(alpha)
+    return mu + sigma * ndtri(alpha)
 
 def compute_cvar_normal(mu: float, sigma: float, alpha: float = 0.05) -> float:
     """
@@ -32,12 +114,13 @@ def compute_cvar_normal(mu: float, sigma: float, alpha: float = 0.05) -> float:
     Output ----------
     CVaR estimate
     """
-    z = norm.ppf(alpha)
-    return mu - sigma * (norm.pdf(z) / alpha)
+    z = ndtri(alpha)
+    return mu - sigma * (_std_norm_pdf(z) / alpha)
 
-def compute_var_student_t(df: float, loc: float, scale: float, alpha: float = 0.05) -> float:
+def compute_var_student_t(df: FloatOrArray, loc: FloatOrArray, scale: FloatOrArray, alpha: FloatOrArray = 0.05) -> FloatOrArray:
     """
     Compute parametric VaR for Student-t distribution.
+    Accepts scalars or arrays (broadcast), e.g. one row per asset or rolling window.
 
     Parameters ----------
     df: Degrees of freedom
@@ -48,11 +131,13 @@ def compute_var_student_t(df: float, loc: float, scale: float, alpha: float = 0.
     Output ----------
     VaR estimate
     """
-    return loc + scale * t.ppf(alpha, df)
+    df, loc, scale, alpha = map(np.asarray, (df, loc, scale, alpha))
+    return loc + scale * _t_ppf(alpha, df)
 
-def compute_cvar_student_t(df: float, loc: float, scale: float, alpha: float = 0.05) -> float:
+def compute_cvar_student_t(df: FloatOrArray, loc: FloatOrArray, scale: FloatOrArray, alpha: FloatOrArray = 0.05) -> FloatOrArray:
     """
     Compute parametric CVaR (Expected Shortfall) for Student-t distribution.
+    Accepts scalars or arrays (broadcast). Returns -inf where df <= 1 (tail mean undefined).
 
     Parameters ----------
     df, loc, scale, alpha
@@ -60,10 +145,88 @@ def compute_cvar_student_t(df: float, loc: float, scale: float, alpha: float = 0
     Output ----------
     CVaR estimate
     """
+    df, loc, scale, alpha = map(np.asarray, (df, loc, scale, alpha))
+    t_q = _t_ppf(alpha, df)
+    return loc - scale * _t_tail_k(t_q, df) / alpha
+
+def compute_var_cvar_normal(mu: float, sigma: float, alpha: float = 0.05) -> Tuple[float, float]:
+    """
+    Compute parametric VaR and CVaR for Normal distribution from a single quantile eval.
+
+    Parameters ----------
+    mu, sigma, alpha
+
+    Output ----------
+    VaR, CVaR estimates
+    """
+    z = ndtri(alpha)
+    return mu + sigma * z, mu - sigma * (_std_norm_pdf(z) / alpha)
+
+def compute_var_cvar_student_t(
+    df: FloatOrArray, loc: FloatOrArray, scale: FloatOrArray, alpha: FloatOrArray = 0.05
+) -> Tuple[FloatOrArray, FloatOrArray]:
+    """
+    Compute parametric VaR and CVaR for Student-t distribution from a single quantile eval.
+    Accepts scalars or arrays (broadcast).
+
+    Parameters ----------
+    df, loc, scale, alpha
+
+    Output ----------
+    VaR, CVaR estimates
+    """
+    df, loc, scale, alpha = map(np.asarray, (df, loc, scale, alpha))
+    t_q = _t_ppf(alpha, df)
+    return loc + scale * t_q, loc - scale * _t_tail_k(t_q, df) / alpha
+
+def compute_var_cvar_student_t_std(
+    df: FloatOrArray, mu: FloatOrArray, sigma: FloatOrArray, alpha: FloatOrArray = 0.05
+) -> Tuple[FloatOrArray, FloatOrArray]:
+    """
+    Compute parametric VaR and CVaR for a variance-normalized Student-t, i.e. when sigma
+    is the standard deviation of returns rather than the t scale.
+    Accepts scalars or arrays (broadcast). Raises ValueError if any df <= 2 (variance is infinite).
+
+    Parameters ----------
+    df: Degrees of freedom
+    mu: Mean return
+    sigma: Standard deviation of returns
+    alpha: Tail probability
+
+    Output ----------
+    VaR, CVaR estimates
+    """
+    df, mu, sigma, alpha = map(np.asarray, (df, mu, sigma, alpha))
+    if np.any(df <= 2):
+        raise ValueError("Variance-normalized Student-t requires df > 2")
+    t_q = _t_ppf(alpha, df)
+    unit_var = np.sqrt((df - 2) / df) # scale of a unit-variance t, computed once for both metrics
+    return mu + sigma * unit_var * t_q, mu - sigma * unit_var * _t_tail_k(t_q, df) / alpha
+
+def compute_cvar_student_t_portfolio(df, loc, scale, alpha: float = 0.05) -> np.ndarray:
+    """
+    Compute Student-t CVaR for many assets in one call. Quantiles come from a single
+    vectorized t.ppf; the closed form runs in a Numba kernel when numba is installed.
+
+    Parameters ----------
+    df, loc, scale: 1-D arrays (or scalars), one entry per asset
+    alpha: Tail probability shared by all assets (scalar)
+
+    Output ----------
+    Array of CVaR estimates
+    """
+    if np.ndim(alpha) != 0:
+        raise ValueError("alpha must be a scalar shared by all assets")
+    df, loc, scale = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=np.float64)) for a in (df, loc, scale)))
+    if df.ndim != 1:
+        raise ValueError("df, loc and scale must be 1-D (one entry per asset)")
+    df, loc, scale = (np.ascontiguousarray(a) for a in (df, loc, scale))
+    kernel = _cvar_t_kernel()
+    if kernel is None:
+        return compute_cvar_student_t(df, loc, scale, alpha)
     t_q = t.ppf(alpha, df)
-    density = t.pdf(t_q, df)
-    adjustment = (df + t_q**2) / (df - 1)
-    return loc - scale * (density / alpha) * adjustment
+    s = _log_gamma_ratio(df / 2)
+    return kernel(t_q, s, df, loc, scale, float(alpha))
 
 if __name__ == "__main__":
     """
@@ -72,12 +235,13 @@ if __name__ == "__main__":
     """
 
     from .distributions import fit_normal, fit_student_t
+    from .returns import load_returns
 
     try:
         base_dir = Path(__file__).resolve().parents[1]
         returns_path = base_dir / "data" / "output" / "data.csv"
 
-        returns = pd.read_csv(returns_path)["return"]
+        returns = load_returns(returns_path).to_numpy() # fits/plots only need the raw array
 
         # Fit distributions
         mu, sigma = fit_normal(returns)
@@ -87,11 +251,32 @@ if __name__ == "__main__":
 
         print("Risk Metric Test\n")
 
-        print(f"Normal VaR (95%):  {compute_var_normal(mu, sigma, alpha):.4f}")
-        print(f"Normal CVaR (95%): {compute_cvar_normal(mu, sigma, alpha):.4f}\n")
+        var_n, cvar_n = compute_var_cvar_normal(mu, sigma, alpha)
+        var_t, cvar_t = compute_var_cvar_student_t(df, loc, scale, alpha)
+
+        print(f"Normal VaR (95%):  {var_n:.4f}")
+        print(f"Normal CVaR (95%): {cvar_n:.4f}\n")
+
+        print(f"Student-t VaR (95%):  {var_t:.4f}")
+        print(f"Student-t CVaR (95%): {cvar_t:.4f}")
+
+        # Variance-normalized form w/ sigma = std dev of the fitted t should reproduce the scale-based metrics
+        if df > 2:
+            sigma_t = scale * np.sqrt(df / (df - 2))
+            var_std, cvar_std = compute_var_cvar_student_t_std(df, loc, sigma_t, alpha)
+            print(f"\nStd-dev parametrization matches scale-based VaR/CVaR: {np.allclose([var_std, cvar_std], [var_t, cvar_t])}")
+
+        # Large df: log-k form vs the textbook pdf * (df + t^2) / (df - 1) product, which is accurate from ~1e5 up
+        df_large = np.array([1e5, 1e7, 1e9])
+        t_q_large = t.ppf(alpha, df_large)
+        k_textbook = t.pdf(t_q_large, df_large) * (df_large + t_q_large**2) / (df_large - 1)
+        print(f"\nLarge-df CVaR matches textbook form: {np.allclose(compute_cvar_student_t(df_large, 0, 1, alpha), -k_textbook / alpha, rtol=1e-13, atol=0)}")
 
-        print(f"Student-t VaR (95%):  {compute_var_student_t(df, loc, scale, alpha):.4f}")
-        print(f"Student-t CVaR (95%): {compute_cvar_student_t(df, loc, scale, alpha):.4f}")
+        # Portfolio path (Numba kernel when installed) should match the vectorized NumPy path
+        df_vec = np.array([df, 3.0, 5.0, 30.0])
+        cvar_port = compute_cvar_student_t_portfolio(df_vec, loc, scale, alpha)
+        cvar_vec = compute_cvar_student_t(df_vec, loc, scale, alpha)
+        print(f"\nPortfolio CVaR matches NumPy path: {np.allclose(cvar_port, cvar_vec)} (max diff {np.max(np.abs(cvar_port - cvar_vec)):.2e})")
 
     except Exception as e:
         print(f"Risk metric test failed: {e}")
\ No newline at end of file
@@ -3,15 +3,22 @@ Author: Jake Vick
 Purpose: Visualization of Normal & Student-t distributions 
 """
 
-from scipy.stats import norm, t, probplot
+from functools import lru_cache
+from scipy.stats import norm, t
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
 import numpy as np
 
-def plot_histogram_with_fits(returns, normal_params, t_params, alpha=0.05):
+from .risk_metrics import compute_var_normal, compute_var_student_t
+
+@lru_cache(maxsize=32)
+def _pdf_grid(kind, params, xmin, xmax, n):
+    """Cached (x, pdf) grid for a fitted "normal" or "t" dist - reused across replots."""
+    x = np.linspace(xmin, xmax, n)
+    frozen = norm(*params) if kind == "normal" else t(*params)
+    return x, frozen.pdf(x)
+
+def plot_histogram_with_fits(returns, normal_params, t_params, alpha=0.05, var_n=None, var_t=None):
     """
     Plot histogram w/ fitted Normal and Student-t prob density functions (PDFs)
     
@@ -20,23 +27,31 @@ def plot_histogram_with_fits(returns, normal_params, t_params, alpha=0.05):
     normal_params: normal dist
     t_params: student t dist
     alpha: tail prob for VaR overlay
+    var_n, var_t: precomputed Normal / Student-t VaR (computed from params if None)
 
     Output ----------
     PDFs histogram
     """
+    import matplotlib.pyplot as plt # deferred so importing this module stays cheap
+
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.histplot(returns, kde=False, stat="density", ax=ax, label="Empirical")
+    counts, edges = np.histogram(returns, bins="auto", density=True)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", alpha=0.5, label="Empirical")
 
-    x = np.linspace(returns.min(), returns.max(), 1000)
-    ax.plot(x, norm.pdf(x, *normal_params), label="Normal Fit", color="red")
-    ax.plot(x, t.pdf(x, *t_params), label="Student-t Fit", color="green")
+    xmin, xmax = float(returns.min()), float(returns.max())
+    ax.plot(*_pdf_grid("normal", tuple(map(float, normal_params)), xmin, xmax, 1000), label="Normal Fit", color="red")
+    ax.plot(*_pdf_grid("t", tuple(map(float, t_params)), xmin, xmax, 1000), label="Student-t Fit", color="green")
 
-    var_n = normal_params[0] + normal_params[1] * norm.ppf(alpha)
-    var_t = t_params[1] + t_params[2] * t.ppf(alpha, t_params[0])
+    if var_n is None:
+        var_n = compute_var_normal(*normal_params, alpha)
+    if var_t is None:
+        var_t = compute_var_student_t(*t_params, alpha)
 
     ax.axvline(var_n, color="red", linestyle="--", label="Normal VaR")
     ax.axvline(var_t, color="green", linestyle="--", label="Student-t VaR")
 
+    ax.set_xlabel("return")
+    ax.set_ylabel("Density")
     ax.set_title("Return Distribution with Fitted PDFs")
     ax.legend()
     return fig
@@ -54,18 +69,34 @@ def plot_qq_plots(returns, normal_params, t_params):
     Output ----------
     Two QQ-plots 
     """
-    fig, axs = plt.subplots(1, 2, figsize=(14, 6))
+    import matplotlib.pyplot as plt
 
-    probplot(returns, dist=norm(*normal_params), plot=axs[0])
-    axs[0].set_title("QQ Plot vs Normal")
+    fig, axs = plt.subplots(1, 2, figsize=(14, 6))
 
-    probplot(returns, dist=t(*t_params), plot=axs[1])
-    axs[1].set_title("QQ Plot vs Student-t")
+    # Sort once and share plotting positions across both dists (probplot re-sorts per call).
+    # (i - 0.5) / n differs from probplot's Filliben medians, so the extreme theoretical
+    # quantiles sit further out than in probplot's version of this plot
+    ordered = np.sort(np.asarray(returns))
+    n = ordered.size
+    p = (np.arange(1, n + 1) - 0.5) / n
+
+    fn, ft = norm(*normal_params), t(*t_params)
+    theoretical = (
+        (fn.ppf(p), "QQ Plot vs Normal"),
+        (ft.ppf(p), "QQ Plot vs Student-t"),
+    )
+    for ax, (q, title) in zip(axs, theoretical):
+        slope, intercept = np.polyfit(q, ordered, 1)
+        ax.plot(q, ordered, "bo")
+        ax.plot(q, slope * q + intercept, "r-")
+        ax.set_xlabel("Theoretical quantiles")
+        ax.set_ylabel("Ordered Values")
+        ax.set_title(title)
 
     return fig
 
 
-def plot_tail_comparison(normal_params, t_params, tail_min=-0.30):
+def plot_tail_comparison(normal_params, t_params, tail_min=-0.30, n=250):
     """
     Plot tail compairson for Normal and Student-t on a log scale - useful when extreme events are common
     
@@ -73,15 +104,17 @@ def plot_tail_comparison(normal_params, t_params, tail_min=-0.30):
     normal_params: normal dist
     t_params: student t dist
     tail_min: min for tail viz
+    n: grid points - log scale doesn't resolve 1000 points on the tail
 
     Output ----------
     left-tail density comparison
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    x_tail = np.linspace(tail_min, 0, 1000)
-    ax.plot(x_tail, norm.pdf(x_tail, *normal_params), label="Normal", color="red")
-    ax.plot(x_tail, t.pdf(x_tail, *t_params), label="Student-t", color="green")
+    ax.plot(*_pdf_grid("normal", tuple(map(float, normal_params)), tail_min, 0.0, n), label="Normal", color="red")
+    ax.plot(*_pdf_grid("t", tuple(map(float, t_params)), tail_min, 0.0, n), label="Student-t", color="green")
 
     ax.set_yscale("log")
     ax.set_title("Left-Tail Density Comparison (Log Scale)")
@@ -93,13 +126,16 @@ if __name__ == "__main__":
     """
     When you run it as a module, make sure you are in the \student_t_var_cvar\ folder and run `python -m src.visualization`, Python understands the package structure and relative imports correctly.
     """
+    import matplotlib.pyplot as plt
+
     from .distributions import fit_normal, fit_student_t
+    from .returns import load_returns
     
     try:
         base_dir = Path(__file__).resolve().parents[1]
         returns_path = base_dir / "data" / "output" / "data.csv"
 
-        returns = pd.read_csv(returns_path)["return"]
+        returns = load_returns(returns_path).to_numpy() # fits/plots only need the raw array
 
         # Fit models (for testing only)
         normal_params = fit_normal(returns)